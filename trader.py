@@ -1,15 +1,46 @@
 import argparse
+import atexit
+import sys
 import requests
 import time
+import threading
 import hmac
-import hashlib
 import json
 from os import environ
+from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from dotenv import load_dotenv
 from colorama import Fore, Style, init
-from apscheduler.schedulers.background import BackgroundScheduler
+from concurrent.futures import ThreadPoolExecutor
 import pytz
 from datetime import datetime, timedelta
+from decimal import Decimal
+
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps_pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps_pretty(obj):
+        return json.dumps(obj, indent=2)
+
+SHANGHAI_TZ = pytz.timezone('Asia/Shanghai')
+UTC = pytz.utc
+
+# 连接池默认大小（与 requests 默认值一致），定时订单更多时按订单数扩容
+DEFAULT_POOL_SIZE = 10
+
+# 币安约 5 分钟断开空闲连接，保活间隔需短于此
+KEEPALIVE_INTERVAL = timedelta(minutes=4)
 
 # 加载环境变量
 load_dotenv()
@@ -17,22 +48,84 @@ load_dotenv()
 # 初始化颜色输出
 init(autoreset=True)
 
+# 余额列表、倒计时等高频输出的颜色常量
+_C_GREEN, _C_YELLOW, _C_MAGENTA, _C_RESET = Fore.GREEN, Fore.YELLOW, Fore.MAGENTA, Style.RESET_ALL
+_CLEAR_EOL = "\x1b[K"
+_DIVIDER = f"{'-'*30}\n"
+
+def _prestart_threads(executor, count):
+    """让线程池立即启动 count 个工作线程（线程池默认在提交任务时才创建线程）"""
+    barrier = threading.Barrier(count + 1)
+    for _ in range(count):
+        executor.submit(barrier.wait)
+    barrier.wait()
+
+def format_decimal(value):
+    """将浮点数格式化为定点小数字符串，避免 1e-06 这类科学计数法被币安拒绝"""
+    if isinstance(value, float):
+        return format(Decimal(repr(value)), 'f')
+    return value
+
 class BinanceTrader:
     def __init__(self, testnet=False):
         self.testnet = testnet
         self.base_url = "https://testnet.binance.vision" if testnet else "https://api.binance.com"
         self.api_key = environ.get("TESTNET_API_KEY" if testnet else "BINANCE_API_KEY")
         self.secret_key = environ.get("TESTNET_SECRET_KEY" if testnet else "BINANCE_SECRET_KEY")
-        self.scheduler = BackgroundScheduler()
-        self.scheduler.start()
+        # 预先完成 HMAC 密钥初始化，签名时只需复制模板
+        self._secret_bytes = (self.secret_key or "").encode("utf-8")
+        self._mac = hmac.new(self._secret_bytes, digestmod="sha256")
+        # 复用连接池，避免每次请求重新进行 TCP/TLS 握手
+        self.session = requests.Session()
+        self._pool_size = 0
+        self._ensure_pool_size(DEFAULT_POOL_SIZE)
+        self.session.headers["X-MBX-APIKEY"] = self.api_key
+        self._get, self._post = self.session.get, self.session.post
+        self._scheduler = None
+        # 每个定时任务完成时置位，主线程据此等待订单提交完毕再退出
+        self._pending_jobs = []
+        atexit.register(self.session.close)
+
+    @property
+    def scheduler(self):
+        """首次定时下单时才导入并启动 APScheduler，加快查询余额、立即下单等路径的启动"""
+        if self._scheduler is None:
+            from apscheduler.schedulers.background import BackgroundScheduler
+            from apscheduler.executors.debug import DebugExecutor
+            from apscheduler.executors.pool import ThreadPoolExecutor as PingExecutor
+
+            # 预热/保活的 ping 使用独立线程池，阻塞时不占用订单任务的工作线程；
+            # 定时订单在调度线程内直接触发，只把订单交给预先启动的发送线程
+            self._scheduler = BackgroundScheduler(
+                executors={
+                    "keepalive": PingExecutor(max_workers=DEFAULT_POOL_SIZE),
+                    "trigger": DebugExecutor(),
+                }
+            )
+            self._scheduler.start()
+            atexit.register(self._scheduler.shutdown)
+        return self._scheduler
+
+    def _ensure_pool_size(self, size):
+        """保证连接池至少能同时保留 size 个连接，不足时重新挂载更大的连接池"""
+        if size <= self._pool_size:
+            return
+        retry = Retry(total=2, backoff_factor=0.1, status_forcelist=(429, 500, 502, 503, 504))
+        old_adapter = self.session.adapters.get("https://")
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=size, max_retries=retry))
+        if old_adapter is not None:
+            old_adapter.close()
+        self._pool_size = size
+
+    def _signed_query(self, params):
+        """编码参数并附加签名，结果可直接作为查询串或表单请求体"""
+        query_string = urlencode(params)
+        return query_string + "&signature=" + self._sign(query_string)
 
-    def _generate_signature(self, params):
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return hmac.new(
-            self.secret_key.encode("utf-8"),
-            query_string.encode("utf-8"),
-            hashlib.sha256
-        ).hexdigest()
+    def _sign(self, query_string):
+        m = self._mac.copy()
+        m.update(query_string.encode("utf-8"))
+        return m.hexdigest()
 
     def _print_header(self, text):
         print(f"\n{Fore.CYAN}{'='*40}")
@@ -41,73 +134,170 @@ class BinanceTrader:
 
     def get_account_info(self):
         endpoint = "/api/v3/account"
-        params = {"timestamp": int(time.time() * 1000)}
-        params["signature"] = self._generate_signature(params)
+        params = {"timestamp": time.time_ns() // 1_000_000}
+        url = self.base_url + endpoint + "?" + self._signed_query(params)
         
         try:
-            response = requests.get(
-                self.base_url + endpoint,
-                headers={"X-MBX-APIKEY": self.api_key},
-                params=params
-            )
-            return response.json()
+            response = self._get(url)
+            return json_loads(response.content)
         except Exception as e:
             print(f"{Fore.RED}获取账户信息失败: {e}{Style.RESET_ALL}")
             return None
 
-    def place_limit_order(self, symbol, side, quantity, price):
-        self._print_header("正在提交限价单")
-        endpoint = "/api/v3/order"
-        params = {
+    def _build_order_params(self, symbol, side, quantity, price):
+        """构造限价单参数（不含时间戳和签名）"""
+        return {
             "symbol": symbol.upper(),
             "side": side.upper(),
             "type": "LIMIT",
             "timeInForce": "GTC",
-            "quantity": quantity,
-            "price": price,
-            "timestamp": int(time.time() * 1000)
+            "quantity": format_decimal(quantity),
+            "price": format_decimal(price),
         }
 
-        params["signature"] = self._generate_signature(params)
+    def place_limit_order(self, symbol, side, quantity, price):
+        self._print_header("正在提交限价单")
+        return self._place_prepared(self._build_order_params(symbol, side, quantity, price))
+
+    def _place_prepared(self, prepared):
+        """为预先构造的订单参数加上时间戳、签名并提交"""
+        endpoint = "/api/v3/order"
+        params = dict(prepared)
+        params["timestamp"] = time.time_ns() // 1_000_000
+
+        # 签名串即表单请求体，只需编码一次
+        body = self._signed_query(params)
 
         try:
-            response = requests.post(
+            response = self._post(
                 self.base_url + endpoint,
-                headers={"X-MBX-APIKEY": self.api_key},
-                params=params
+                data=body,
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
             )
-            response.raise_for_status()
-            return response.json()
         except requests.exceptions.RequestException as e:
-            error_msg = json.loads(e.response.text)['msg'] if e.response else str(e)
+            print(f"{Fore.RED}订单提交失败: {e}{Style.RESET_ALL}")
+            return None
+
+        # 直接按状态码分支，被拒订单不走异常路径
+        try:
+            data = json_loads(response.content)
+        except ValueError:
+            data = None
+        if response.status_code >= 400:
+            error_msg = data.get('msg', response.text) if isinstance(data, dict) else response.text
             print(f"{Fore.RED}订单提交失败: {error_msg}{Style.RESET_ALL}")
             return None
+        return data
+
+    def place_orders(self, orders):
+        """批量立即下单，orders 为 (symbol, side, quantity, price) 列表，多个订单并发提交"""
+        self._print_header("正在提交限价单")
+        prepared = [self._build_order_params(*order) for order in orders]
+        if len(prepared) == 1:
+            return [self._place_prepared(prepared[0])]
+        self._ensure_pool_size(len(prepared))
+        with ThreadPoolExecutor(max_workers=len(prepared)) as executor:
+            return list(executor.map(self._place_prepared, prepared))
 
     def schedule_order(self, symbol, side, quantity, price, target_time):
         """定时下单功能"""
-        def job():
-            current_time = datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
-            self._print_header(f"定时订单触发 {current_time}")
-            result = self.place_limit_order(symbol, side, quantity, price)
-            if result:
-                print(f"{Fore.GREEN}订单创建成功！订单ID: {result['orderId']}{Style.RESET_ALL}")
-            else:
-                print(f"{Fore.RED}定时下单失败{Style.RESET_ALL}")
+        return self.schedule_orders([(symbol, side, quantity, price)], target_time)
 
+    def schedule_orders(self, orders, target_time):
+        """批量定时下单，所有订单在同一时刻触发并发提交"""
+        run_date = target_time.astimezone(UTC)
+        # 每个订单在触发时都能拿到一个已预热的连接
+        self._ensure_pool_size(len(orders))
+        # 触发前完成参数构造，触发时只需加时间戳、签名并发送
+        prepared = [self._build_order_params(*order) for order in orders]
+        # 整批订单由专属线程池并发发送：每个订单一个线程，另加一个线程汇总结果。
+        # 线程在此预先启动，触发时无需再新建线程
+        executor = ThreadPoolExecutor(max_workers=len(prepared) + 1)
+        _prestart_threads(executor, len(prepared) + 1)
+        done = threading.Event()
+        self._pending_jobs.append(done)
         self.scheduler.add_job(
-            job,
+            self._scheduled_job,
             'date',
-            run_date=target_time.astimezone(pytz.utc)
+            run_date=run_date,
+            args=(prepared, executor, done),
+            executor='trigger',
+            # 即使启动晚于计划时间也要提交，不能静默丢弃订单
+            misfire_grace_time=None
         )
+        # 等待期间提前建立 TLS 连接并定期保活（币安约 5 分钟断开空闲连接）
+        warm_count = min(len(orders), DEFAULT_POOL_SIZE)
+        self._warm(warm_count)
+        # 触发前停止保活，避免 ping 与订单同时进行
+        keepalive_end = run_date - timedelta(seconds=30)
+        if keepalive_end > datetime.now(UTC) + KEEPALIVE_INTERVAL:
+            self.scheduler.add_job(
+                self._warm,
+                'interval',
+                seconds=KEEPALIVE_INTERVAL.total_seconds(),
+                end_date=keepalive_end,
+                args=(warm_count,),
+                executor='keepalive',
+                id='keepalive',
+                replace_existing=True
+            )
         return target_time
 
+    def _warm(self, count):
+        """在独立线程池中并发发送 count 个 ping 预热连接"""
+        for _ in range(count):
+            self.scheduler.add_job(self._ping, executor='keepalive')
+
+    def wait_scheduled_orders(self):
+        """阻塞直到所有已设置的定时任务执行完毕"""
+        for done in self._pending_jobs:
+            done.wait()
+
+    def _scheduled_job(self, prepared, executor, done):
+        """在调度线程中执行：只把订单交给发送线程，不等待结果，避免阻塞调度器"""
+        try:
+            futures = [executor.submit(self._place_safely, params) for params in prepared]
+            executor.submit(self._report_scheduled, prepared, futures, executor, done)
+        except BaseException:
+            executor.shutdown(wait=False)
+            done.set()
+            raise
+
+    def _report_scheduled(self, prepared, futures, executor, done):
+        try:
+            results = [future.result() for future in futures]
+            current_time = datetime.now(SHANGHAI_TZ).strftime('%Y-%m-%d %H:%M:%S')
+            self._print_header(f"定时订单触发 {current_time}")
+            for params, result in zip(prepared, results):
+                if result:
+                    print(f"{Fore.GREEN}{params['symbol']} 订单创建成功！订单ID: {result['orderId']}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.RED}{params['symbol']} 定时下单失败{Style.RESET_ALL}")
+        finally:
+            executor.shutdown(wait=False)
+            done.set()
+
+    def _place_safely(self, prepared):
+        """提交单个订单，异常只影响该订单，不丢失整批结果"""
+        try:
+            return self._place_prepared(prepared)
+        except Exception as e:
+            print(f"{Fore.RED}{prepared['symbol']} 订单提交异常: {e}{Style.RESET_ALL}")
+            return None
+
+    def _ping(self):
+        """轻量请求，用于预热和保持连接池中的连接"""
+        try:
+            self._get(self.base_url + "/api/v3/ping", timeout=5)
+        except requests.exceptions.RequestException:
+            pass
+
 def parse_time_input(time_str):
     """解析时间字符串"""
-    shanghai_tz = pytz.timezone('Asia/Shanghai')
     try:
         hour, minute = map(int, time_str.split(':'))
-        now = datetime.now(shanghai_tz)
-        target_time = shanghai_tz.localize(
+        now = datetime.now(SHANGHAI_TZ)
+        target_time = SHANGHAI_TZ.localize(
             datetime(now.year, now.month, now.day, hour, minute)
         )
         if target_time < now:
@@ -116,25 +306,35 @@ def parse_time_input(time_str):
     except ValueError:
         raise argparse.ArgumentTypeError("时间格式错误，请使用 HH:MM 格式")
 
+def parse_order_spec(spec):
+    """解析批量订单参数，格式 SYMBOL:SIDE:QUANTITY:PRICE"""
+    try:
+        symbol, side, quantity, price = spec.split(':')
+        side = side.upper()
+        if side not in ('BUY', 'SELL'):
+            raise ValueError(side)
+        return symbol.upper(), side, float(quantity), float(price)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"订单格式错误: {spec}，请使用 SYMBOL:SIDE:QUANTITY:PRICE 格式")
+
 def print_balance(account):
     """美化显示账户余额"""
-    print(f"\n{Fore.GREEN}【账户资产概览】")
-    print(f"{'-'*30}")
-    for balance in account['balances']:
-        free = float(balance['free'])
-        if free > 0:
-            print(f"{balance['asset']:>6}: {Fore.YELLOW}{free:<15.8f}{Style.RESET_ALL}")
-    print(f"{'-'*30}")
+    balances = [(b['asset'], free) for b in account['balances'] if (free := float(b['free'])) > 0]
+    lines = [f"\n{_C_GREEN}【账户资产概览】{_C_RESET}\n", _DIVIDER]
+    lines.extend(f"{asset:>6}: {_C_YELLOW}{free:<15.8f}{_C_RESET}\n" for asset, free in balances)
+    lines.append(_DIVIDER)
+    # 合并为一次写入
+    sys.stdout.write("".join(lines))
+    sys.stdout.flush()
 
 def get_valid_time_input():
     """获取有效的时间输入"""
-    shanghai_tz = pytz.timezone('Asia/Shanghai')
     while True:
         time_input = input(f"{Fore.CYAN}请输入挂单时间（上海时间，格式HH:MM，例如18:00）: {Style.RESET_ALL}").strip()
         try:
             hour, minute = map(int, time_input.split(':'))
-            now = datetime.now(shanghai_tz)
-            target_time = shanghai_tz.localize(
+            now = datetime.now(SHANGHAI_TZ)
+            target_time = SHANGHAI_TZ.localize(
                 datetime(now.year, now.month, now.day, hour, minute)
             )
             if target_time < now:
@@ -143,6 +343,39 @@ def get_valid_time_input():
         except ValueError:
             print(f"{Fore.RED}时间格式错误，请使用HH:MM格式{Style.RESET_ALL}")
 
+def countdown(scheduled_time):
+    """显示倒计时，直到计划时间；被 Ctrl-C 中断时返回 False
+
+    仅负责显示，不保证订单已发出，退出前需配合 wait_scheduled 等待任务完成
+    """
+    # 只换算一次挂钟时间，之后按单调时钟计时，不受系统时间调整影响
+    deadline = time.monotonic() + (scheduled_time - datetime.now(SHANGHAI_TZ)).total_seconds()
+    try:
+        while (remaining := deadline - time.monotonic()) > 0:
+            rem_s = int(remaining)
+            # 单次写入：回车 + 剩余时间 + 清除行尾
+            sys.stdout.write(f"\r{_C_MAGENTA}剩余等待时间: {rem_s // 3600:02d}:{rem_s % 3600 // 60:02d}:{rem_s % 60:02d}{_CLEAR_EOL}")
+            sys.stdout.flush()
+            # 在显示的秒数变化时才唤醒
+            time.sleep(remaining % 1 or 1)
+        print()
+        return True
+    except KeyboardInterrupt:
+        print(f"{Fore.YELLOW}\n程序已退出，定时任务可能尚未执行{Style.RESET_ALL}")
+        return False
+
+def wait_scheduled(trader, scheduled_time):
+    """倒计时并等待定时订单提交完毕；被 Ctrl-C 中断时返回 False"""
+    if not countdown(scheduled_time):
+        return False
+    # 倒计时结束不代表订单已发出，等任务完成后再退出，避免解释器关闭时丢单
+    try:
+        trader.wait_scheduled_orders()
+        return True
+    except KeyboardInterrupt:
+        print(f"{Fore.YELLOW}\n程序已退出，定时订单可能尚未提交完成{Style.RESET_ALL}")
+        return False
+
 def interactive_trading():
     print(f"\n{Fore.YELLOW}=== 币安智能交易终端 ==={Style.RESET_ALL}")
     
@@ -171,18 +404,8 @@ def interactive_trading():
             scheduled_time = trader.schedule_order(symbol, side, quantity, price, target_time)
             print(f"\n{Fore.GREEN}定时任务已设置！计划执行时间: {scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}（上海时间）{Style.RESET_ALL}")
             
-            # 显示倒计时
-            try:
-                while True:
-                    now = datetime.now(pytz.timezone('Asia/Shanghai'))
-                    remaining = scheduled_time - now
-                    if remaining.total_seconds() <= 0:
-                        break
-                    print(f"\r{Fore.MAGENTA}剩余等待时间: {str(remaining).split('.')[0]}", end="")
-                    time.sleep(1)
-                print()
-            except KeyboardInterrupt:
-                print(f"{Fore.YELLOW}\n程序已退出，定时任务可能尚未执行{Style.RESET_ALL}")
+            # 显示倒计时并等待订单提交完毕
+            if not wait_scheduled(trader, scheduled_time):
                 return
         else:
             print(f"{Fore.YELLOW}已取消定时订单设置{Style.RESET_ALL}")
@@ -194,7 +417,7 @@ def interactive_trading():
             result = trader.place_limit_order(symbol, side, quantity, price)
             if result:
                 print(f"\n{Fore.GREEN}订单创建成功！")
-                print(json.dumps(result, indent=2))
+                print(json_dumps_pretty(result))
                 print(f"订单ID: {result['orderId']}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.RED}订单创建失败{Style.RESET_ALL}")
@@ -208,16 +431,27 @@ def main(args):
     if args.show_balance:
         account = trader.get_account_info()
         if account:
-            print(f"\n{Fore.GREEN}【账户资产概览】")
-            print(f"{'-'*30}")
-            for balance in account['balances']:
-                free = float(balance['free'])
-                if free > 0:
-                    print(f"{balance['asset']:>6}: {Fore.YELLOW}{free:<15.8f}{Style.RESET_ALL}")
-            print(f"{'-'*30}")
+            print_balance(account)
+
+    # 批量下单逻辑
+    if args.batch:
+        if args.schedule_time:
+            target_time = parse_time_input(args.schedule_time)
+            print(f"{Fore.YELLOW}设置 {len(args.batch)} 个定时订单于 {target_time.strftime('%Y-%m-%d %H:%M:%S')}（上海时间）")
+            scheduled_time = trader.schedule_orders(args.batch, target_time)
+
+            # 显示倒计时并等待订单提交完毕
+            wait_scheduled(trader, scheduled_time)
+        else:
+            results = trader.place_orders(args.batch)
+            for (symbol, *_), result in zip(args.batch, results):
+                if result:
+                    print(f"{Fore.GREEN}{symbol} 订单创建成功！订单ID: {result['orderId']}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.RED}{symbol} 订单创建失败{Style.RESET_ALL}")
 
     # 下单逻辑
-    if args.symbol and args.side and args.quantity and args.price:
+    elif args.symbol and args.side and args.quantity and args.price:
         if args.schedule_time:
             target_time = parse_time_input(args.schedule_time)
             print(f"{Fore.YELLOW}设置定时订单于 {target_time.strftime('%Y-%m-%d %H:%M:%S')}（上海时间）")
@@ -229,18 +463,8 @@ def main(args):
                 target_time
             )
             
-            # 显示倒计时
-            try:
-                while True:
-                    now = datetime.now(pytz.timezone('Asia/Shanghai'))
-                    remaining = scheduled_time - now
-                    if remaining.total_seconds() <= 0:
-                        break
-                    print(f"\r{Fore.MAGENTA}剩余等待时间: {str(remaining).split('.')[0]}", end="")
-                    time.sleep(1)
-                print()
-            except KeyboardInterrupt:
-                print(f"{Fore.YELLOW}\n程序已退出，定时任务可能尚未执行{Style.RESET_ALL}")
+            # 显示倒计时并等待订单提交完毕
+            wait_scheduled(trader, scheduled_time)
         else:
             result = trader.place_limit_order(
                 args.symbol,
@@ -250,7 +474,7 @@ def main(args):
             )
             if result:
                 print(f"\n{Fore.GREEN}订单创建成功！")
-                print(json.dumps(result, indent=2))
+                print(json_dumps_pretty(result))
                 print(f"订单ID: {result['orderId']}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.RED}订单创建失败{Style.RESET_ALL}")
@@ -266,8 +490,12 @@ if __name__ == "__main__":
                       help='定时执行时间（上海时间格式 HH:MM）')
     parser.add_argument('--show_balance', action='store_true', 
                       help='显示账户余额')
+    parser.add_argument('--batch', type=parse_order_spec, nargs='+', metavar='SYMBOL:SIDE:QUANTITY:PRICE',
+                      help='批量下单，多个订单同时并发提交，可配合 --schedule_time 定时')
 
     args = parser.parse_args()
+    if args.batch and (args.symbol or args.side or args.quantity or args.price):
+        parser.error("--batch 不能与 --symbol/--side/--quantity/--price 同时使用")
 
     if not any(vars(args).values()):
         interactive_trading()